@@ -1,13 +1,17 @@
 import sqlite3
 import os
+import string
+import csv
 import json
-import hashlib
+import zlib
+from functools import lru_cache
 from todoist_api_python.api import TodoistAPI
 from dotenv import load_dotenv
 import miro_api
-import pandas as pd
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pydantic import ValidationError
 
 # Load environment variables from .env file
@@ -23,296 +27,529 @@ todoist_projectid = os.getenv('TEAM_PROJECT_ID')
 DB_FILE = 'todoist_tasks.db'
 COLORS_FILE = 'colors.csv'
 
-def init_db():
+# Miro card layout within the "Eingang" frame
+MAX_CARDS_PER_COLUMN = 17
+CARD_WIDTH = 300
+CARD_HEIGHT = 100
+CARD_HORIZONTAL_SPACING = 10  # Abstand zwischen Spalten
+CARD_VERTICAL_SPACING = 1  # Abstand zwischen Zeilen
+CARD_COLUMN_STRIDE = CARD_WIDTH + CARD_HORIZONTAL_SPACING
+CARD_ROW_STRIDE = CARD_HEIGHT + CARD_VERTICAL_SPACING
+
+# Number of concurrent requests against the Miro API
+MIRO_MAX_WORKERS = 8
+# How often a card request is retried after Miro answers 429 Too Many Requests
+MIRO_RATE_LIMIT_RETRIES = 5
+# Number of concurrent requests against the Todoist API
+TODOIST_MAX_WORKERS = 8
+
+# Connection-level tuning applied to every SQLite connection
+DB_PRAGMAS = '''
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-65536;
+    PRAGMA mmap_size=268435456;
+    PRAGMA cache_spill=OFF;
+'''
+
+# Size of the per-connection cache of compiled SQL statements
+DB_CACHED_STATEMENTS = 256
+
+def connect_db():
+    """Open a tuned connection to the SQLite database."""
+    # Autocommit mode: multi-statement writes use an explicit BEGIN/COMMIT
+    conn = sqlite3.connect(DB_FILE, isolation_level=None, cached_statements=DB_CACHED_STATEMENTS)
+    conn.executescript(DB_PRAGMAS)
+    return conn
+
+# API clients are cached per token so their HTTP sessions (and keep-alive connections) are reused
+@lru_cache(maxsize=None)
+def todoist_client(api_token):
+    """Return the shared Todoist API client for a token."""
+    return TodoistAPI(api_token)
+
+@lru_cache(maxsize=None)
+def miro_client(access_token):
+    """Return the shared Miro API client for a token."""
+    return miro_api.MiroApi(access_token)
+
+@lru_cache(maxsize=None)
+def miro_session(access_token):
+    """Return the shared HTTP session for raw Miro REST calls."""
+    session = requests.Session()
+    # One pooled connection per worker thread, so concurrent card requests reuse their connections.
+    # Rate-limited requests (429) are retried after the delay Miro sends in Retry-After.
+    # Nothing else is retried: a card POST that failed mid-flight may already have created the card.
+    retry = Retry(
+        total=MIRO_RATE_LIMIT_RETRIES, connect=0, read=0, other=0,
+        status_forcelist=[429], allowed_methods=['POST', 'PATCH'],
+        backoff_factor=1, respect_retry_after_header=True, raise_on_status=False,
+    )
+    session.mount('https://', HTTPAdapter(pool_maxsize=MIRO_MAX_WORKERS, max_retries=retry))
+    session.headers.update({
+        'accept': 'application/json',
+        'authorization': f'Bearer {access_token}',
+        'content-type': 'application/json',
+    })
+    return session
+
+# Hot statements live in module constants so every call passes the identical string
+# and sqlite3 reuses its compiled statement from the per-connection cache
+INSERT_TASK_SQL = '''
+    INSERT OR IGNORE INTO tasks (
+        id, content, project_id, due_date, due_datetime, due_string, due_timezone,
+        creator_id, created_at, assignee_id, assigner_id, comment_count, is_completed,
+        description, labels, "order", priority, section_id, parent_id, url,
+        duration_amount, duration_unit, owner, sync_status, miro_id, assignee_firstname,
+        assignee_hex_color
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+UPDATE_TASK_SQL = '''
+    UPDATE tasks SET
+        content = ?, project_id = ?, due_date = ?, due_datetime = ?, due_string = ?, due_timezone = ?,
+        creator_id = ?, created_at = ?, assignee_id = ?, assigner_id = ?, comment_count = ?, is_completed = ?,
+        description = ?, labels = ?, "order" = ?, priority = ?, section_id = ?, parent_id = ?, url = ?,
+        duration_amount = ?, duration_unit = ?, owner = ?, assignee_hex_color = ?, sync_status = ?
+    WHERE id = ?
+'''
+
+INSERT_COLLABORATOR_SQL = '''
+    INSERT OR IGNORE INTO collaborators (id, name, email, first_name)
+    VALUES (?, ?, ?, ?)
+'''
+
+SELECT_TASKS_TO_CREATE_SQL = 'SELECT id, content, description, assignee_hex_color, due_date, assignee_id FROM tasks WHERE sync_status = 0'
+SELECT_TASKS_TO_UPDATE_SQL = 'SELECT id, content, description, assignee_hex_color, due_date, miro_id, assignee_id FROM tasks WHERE sync_status = 2'
+MARK_CARD_CREATED_SQL = 'UPDATE tasks SET sync_status = 1, miro_id = ? WHERE id = ?'
+MARK_CARD_UPDATED_SQL = 'UPDATE tasks SET sync_status = 1 WHERE id = ?'
+
+# Table definitions; every table is keyed by a TEXT ID, so they are stored WITHOUT ROWID
+TABLE_SCHEMAS = {
+    'tasks': '''
+        CREATE TABLE IF NOT EXISTS tasks (
+            id TEXT PRIMARY KEY,
+            content TEXT,
+            project_id TEXT,
+            due_date TEXT,
+            due_datetime TEXT,
+            due_string TEXT,
+            due_timezone TEXT,
+            creator_id TEXT,
+            created_at TEXT,
+            assignee_id TEXT,
+            assigner_id TEXT,
+            comment_count INTEGER,
+            is_completed INTEGER,
+            description TEXT,
+            labels TEXT,
+            "order" INTEGER,
+            priority INTEGER,
+            section_id TEXT,
+            parent_id TEXT,
+            url TEXT,
+            duration_amount INTEGER,
+            duration_unit TEXT,
+            owner TEXT,
+            sync_status INTEGER,
+            miro_id TEXT,
+            assignee_firstname TEXT,
+            assignee_hex_color TEXT
+        ) WITHOUT ROWID
+    ''',
+    'collaborators': '''
+        CREATE TABLE IF NOT EXISTS collaborators (
+            id TEXT PRIMARY KEY,
+            name TEXT,
+            email TEXT,
+            first_name TEXT,
+            hex_color TEXT,
+            tag_id TEXT
+        ) WITHOUT ROWID
+    ''',
+    'meta': '''
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        ) WITHOUT ROWID
+    ''',
+}
+
+def init_db(conn):
     """Initialize the SQLite database."""
-    with sqlite3.connect(DB_FILE) as conn:
+    with conn:
         cursor = conn.cursor()
+        for schema in TABLE_SCHEMAS.values():
+            cursor.execute(schema)
+        rebuild_rowid_tables(conn)
         cursor.executescript('''
-            CREATE TABLE IF NOT EXISTS tasks (
-                id TEXT PRIMARY KEY,
-                content TEXT,
-                project_id TEXT,
-                due_date TEXT,
-                due_datetime TEXT,
-                due_string TEXT,
-                due_timezone TEXT,
-                creator_id TEXT,
-                created_at TEXT,
-                assignee_id TEXT,
-                assigner_id TEXT,
-                comment_count INTEGER,
-                is_completed INTEGER,
-                description TEXT,
-                labels TEXT,
-                "order" INTEGER,
-                priority INTEGER,
-                section_id TEXT,
-                parent_id TEXT,
-                url TEXT,
-                duration_amount INTEGER,
-                duration_unit TEXT,
-                owner TEXT,
-                sync_status INTEGER,
-                miro_id TEXT,
-                assignee_firstname TEXT,
-                assignee_hex_color TEXT
-            );
-            
-            CREATE TABLE IF NOT EXISTS collaborators (
-                id TEXT PRIMARY KEY,
-                name TEXT,
-                email TEXT,
-                first_name TEXT,
-                hex_color TEXT,
-                tag_id TEXT
-            );
+            -- Partial indexes stay tiny because nearly all tasks are synced (sync_status = 1)
+            CREATE INDEX IF NOT EXISTS idx_tasks_sync_status ON tasks(sync_status) WHERE sync_status = 0;
+            CREATE INDEX IF NOT EXISTS idx_tasks_sync_status_updated ON tasks(sync_status) WHERE sync_status = 2;
+            CREATE INDEX IF NOT EXISTS idx_tasks_assignee ON tasks(assignee_id);
+            -- Done-frame cards are resolved back to tasks by their Miro ID
+            CREATE INDEX IF NOT EXISTS idx_tasks_miro_id ON tasks(miro_id) WHERE miro_id IS NOT NULL;
+            -- Miro tags are matched to collaborators by first name, ignoring case
+            CREATE INDEX IF NOT EXISTS idx_collaborators_first_name ON collaborators(first_name COLLATE NOCASE);
         ''')
 
-def add_column_if_not_exists(table, column, column_type):
-    """Add a column to an existing table if it does not exist."""
-    with sqlite3.connect(DB_FILE) as conn:
-        cursor = conn.cursor()
-        cursor.execute(f"PRAGMA table_info({table})")
-        columns = [info[1] for info in cursor.fetchall()]
-        if column not in columns:
-            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
-
-def get_existing_ids(table, column):
-    """Get existing IDs from a specified table."""
-    with sqlite3.connect(DB_FILE) as conn:
-        cursor = conn.cursor()
-        cursor.execute(f'SELECT {column} FROM {table}')
-        return set(row[0] for row in cursor.fetchall())
-
-def insert_tasks_into_db(tasks):
+def rebuild_rowid_tables(conn):
+    """Copy tables created before the switch to WITHOUT ROWID into the current schema."""
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT name FROM sqlite_master
+        WHERE type = 'table' AND name IN ('tasks', 'collaborators') AND sql NOT LIKE '%WITHOUT ROWID%'
+    ''')
+    rowid_tables = [row[0] for row in cursor.fetchall()]
+    if not rowid_tables:
+        return
+
+    conn.execute('BEGIN')
+    for table in rowid_tables:
+        cursor.execute(f'ALTER TABLE {table} RENAME TO {table}_rowid')
+        cursor.execute(TABLE_SCHEMAS[table])
+        # Old databases may lack columns that were added later, so copy only what exists
+        cursor.execute(f'PRAGMA table_info({table}_rowid)')
+        columns = ', '.join(f'"{info[1]}"' for info in cursor.fetchall())
+        cursor.execute(f'INSERT INTO {table} ({columns}) SELECT {columns} FROM {table}_rowid')
+        cursor.execute(f'DROP TABLE {table}_rowid')
+        print(f"Rebuilt table {table} as WITHOUT ROWID.")
+    conn.commit()
+
+# json.dumps builds a new JSONEncoder on every call with non-default options, so reuse one
+LABELS_ENCODER = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False)
+
+def encode_labels(labels):
+    """Serialize task labels to compact JSON for storage."""
+    return LABELS_ENCODER.encode(labels)
+
+def task_to_row(task, assignee_hex_color):
+    """Build the tasks table row for a Todoist task."""
+    duration_amount, duration_unit = (task.duration.get('amount'), task.duration.get('unit')) if hasattr(task, 'duration') and task.duration else (None, None)
+    return (
+        task.id, task.content, task.project_id,
+        task.due.date if task.due else None,
+        task.due.datetime if task.due else None,
+        task.due.string if task.due else None,
+        task.due.timezone if task.due else None,
+        task.creator_id, task.created_at, task.assignee_id,
+        task.assigner_id, task.comment_count,
+        int(task.is_completed), task.description,
+        encode_labels(task.labels), task.order, task.priority,
+        task.section_id, task.parent_id, task.url,
+        duration_amount, duration_unit,
+        'owner', 0, None, None,
+        assignee_hex_color
+    )
+
+def insert_tasks_into_db(conn, tasks):
     """Insert tasks into the SQLite database."""
-    existing_task_ids = get_existing_ids('tasks', 'id')
-    new_tasks_count = 0
-
-    with sqlite3.connect(DB_FILE) as conn:
+    with conn:
         cursor = conn.cursor()
-        for task in tasks:
-            if task.id not in existing_task_ids:
-                assignee_id = task.assignee_id
-                assignee_hex_color = fetch_assignee_hex_color(cursor, assignee_id) if assignee_id else '#ffffff'
-                duration_amount, duration_unit = (task.duration.get('amount'), task.duration.get('unit')) if hasattr(task, 'duration') and task.duration else (None, None)
-                
-                cursor.execute('''
-                    INSERT OR IGNORE INTO tasks (
-                        id, content, project_id, due_date, due_datetime, due_string, due_timezone,
-                        creator_id, created_at, assignee_id, assigner_id, comment_count, is_completed,
-                        description, labels, "order", priority, section_id, parent_id, url,
-                        duration_amount, duration_unit, owner, sync_status, miro_id, assignee_firstname,
-                        assignee_hex_color
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    task.id, task.content, task.project_id, 
-                    task.due.date if task.due else None,
-                    task.due.datetime if task.due else None,
-                    task.due.string if task.due else None,
-                    task.due.timezone if task.due else None,
-                    task.creator_id, task.created_at, assignee_id, 
-                    task.assigner_id, task.comment_count, 
-                    int(task.is_completed), task.description, 
-                    json.dumps(task.labels), task.order, task.priority, 
-                    task.section_id, task.parent_id, task.url, 
-                    duration_amount, duration_unit,
-                    'owner', 0, None, None,
-                    assignee_hex_color
-                ))
-                new_tasks_count += 1
+        # Load all collaborator colors once instead of querying per task
+        hex_colors = fetch_collaborator_hex_colors(cursor)
+
+        # A generator lets executemany pull one row at a time instead of materializing them all
+        rows = (
+            task_to_row(task, lookup_assignee_hex_color(hex_colors, task.assignee_id))
+            for task in tasks
+        )
+
+        conn.execute('BEGIN')
+        cursor.executemany(INSERT_TASK_SQL, rows)
+        # Existing tasks are skipped by INSERT OR IGNORE, so rowcount is the number of new tasks
+        new_tasks_count = cursor.rowcount
+        conn.commit()
     return new_tasks_count
 
-def insert_collaborators_into_db(collaborators, colors_dict):
+def insert_collaborators_into_db(conn, collaborators, colors_dict):
     """Insert collaborators into the SQLite database."""
-    existing_collaborator_ids = get_existing_ids('collaborators', 'id')
-    new_collaborators_count = 0
+    rows = (
+        (collaborator.id, collaborator.name, collaborator.email, extract_first_name(collaborator.name))
+        for collaborator in collaborators
+    )
 
-    with sqlite3.connect(DB_FILE) as conn:
+    with conn:
         cursor = conn.cursor()
-        for collaborator in collaborators:
-            if collaborator.id not in existing_collaborator_ids:
-                first_name = extract_first_name(collaborator.name)
-                cursor.execute('''
-                    INSERT OR IGNORE INTO collaborators (id, name, email, first_name)
-                    VALUES (?, ?, ?, ?)
-                ''', (collaborator.id, collaborator.name, collaborator.email, first_name))
-                new_collaborators_count += 1
+        conn.execute('BEGIN')
+        cursor.executemany(INSERT_COLLABORATOR_SQL, rows)
+        # Known collaborators are skipped by INSERT OR IGNORE, so rowcount is the number of new ones
+        new_collaborators_count = cursor.rowcount
+        conn.commit()
     return new_collaborators_count
 
 def fetch_todoist_tasks(api_token, project_id):
     """Fetch tasks from a specific Todoist project."""
-    api = TodoistAPI(api_token)
+    api = todoist_client(api_token)
     try:
-        return api.get_tasks(project_id=project_id)
+        tasks = api.get_tasks(project_id=project_id)
+        # Newer SDK versions page through the results lazily; drain all pages into one list
+        return tasks if isinstance(tasks, list) else [task for page in tasks for task in page]
     except Exception as error:
         print(f"Error fetching tasks: {error}")
         return []
 
 def fetch_todoist_collaborators(api_token, project_id):
     """Fetch collaborators from a specific Todoist project."""
-    api = TodoistAPI(api_token)
+    api = todoist_client(api_token)
     try:
         return api.get_collaborators(project_id=project_id)
     except Exception as error:
         print(f"Error fetching collaborators: {error}")
         return []
 
-def update_assignee_firstname():
+def update_assignee_firstname(conn):
     """Update the first name of the assignee in the tasks table."""
-    with sqlite3.connect(DB_FILE) as conn:
+    with conn:
         cursor = conn.cursor()
         cursor.execute('''
             UPDATE tasks
-            SET assignee_firstname = (
-                SELECT first_name
-                FROM collaborators
-                WHERE tasks.assignee_id = collaborators.id
-            )
+            SET assignee_firstname = collaborators.first_name
+            FROM collaborators
+            WHERE tasks.assignee_id = collaborators.id
+              AND tasks.assignee_firstname IS NOT collaborators.first_name
         ''')
         conn.commit()
 
-def fetch_tasks_to_sync():
+def fetch_tasks_to_sync(conn):
     """Fetch tasks to sync from the SQLite database."""
-    with sqlite3.connect(DB_FILE) as conn:
+    with conn:
         cursor = conn.cursor()
         cursor.execute('SELECT id, content, description, assignee_hex_color, due_date FROM tasks WHERE sync_status = 0')
         return cursor.fetchall()
 
-def fetch_assignee_tag_id(cursor, assignee_id):
-    """Fetch the tag ID of the assignee."""
-    cursor.execute('SELECT tag_id FROM collaborators WHERE id = ?', (assignee_id,))
-    result = cursor.fetchone()
-    return result[0] if result else None
-
-
+def fetch_collaborator_tag_ids(cursor):
+    """Fetch the Miro tag IDs of all collaborators keyed by collaborator ID."""
+    cursor.execute('SELECT id, tag_id FROM collaborators')
+    return dict(cursor.fetchall())
+
+
+# SQLite's NOCASE collation only folds ASCII letters
+NOCASE_FOLD = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# Miro color names and their hex codes
+COLOR_MAP = {
+    'red': '#f24726',
+    'green': '#8fd14f',
+    'blue': '#2d9bf0',
+    'yellow': '#fef445',
+    'orange': '#fac710',
+    'purple': '#652cb3',
+    'black': '#000000',
+    'white': '#FFFFFF',
+    'gray': '#808080',
+    'pink': '#FFC0CB',
+    'light_green': '#cee741',
+    'cyan': '#12cdd4',
+    'magenta': '#da0063',
+    'violet': '#9510ac',
+    'dark_green': '#0ca789',
+    'dark_blue': '#414bb2',
+    # Add more colors as needed
+}
+
+@lru_cache(maxsize=128)
 def color_name_to_hex(color_name):
     """Convert color name to hex code."""
-    color_map = {
-        'red': '#f24726',
-        'green': '#8fd14f',
-        'blue': '#2d9bf0',
-        'yellow': '#fef445',
-        'orange': '#fac710',
-        'purple': '#652cb3',
-        'black': '#000000',
-        'white': '#FFFFFF',
-        'gray': '#808080',
-        'pink': '#FFC0CB',
-        'light_green': '#cee741',
-        'cyan': '#12cdd4',
-        'magenta': '#da0063',
-        'violet': '#9510ac',
-        'dark_green': '#0ca789',
-        'dark_blue': '#414bb2',
-        # Add more colors as needed
+    return COLOR_MAP.get(color_name.lower(), color_name)
+
+def format_due_date(due_date):
+    """Format a stored YYYY-MM-DD due date as the UTC midnight timestamp Miro expects."""
+    # The database holds ISO dates already, so no datetime parsing is needed
+    return f'{due_date}T00:00:00Z' if due_date else None
+
+def build_card_payload(idx, task, x_offset, y_offset):
+    """Build the Miro card payload for the idx-th task placed in the frame."""
+    column_index, row_index = divmod(idx, MAX_CARDS_PER_COLUMN)
+    x_position = column_index * CARD_COLUMN_STRIDE + x_offset
+    y_position = row_index * CARD_ROW_STRIDE + y_offset
+
+    due_date_formatted = format_due_date(task[4])
+
+    card_theme_hex = color_name_to_hex(task[3])
+
+    return {
+        "data": {
+            "description": task[2],
+            "title": task[1],
+            "dueDate": due_date_formatted
+        },
+        "style": {
+            "cardTheme": card_theme_hex
+        },
+        "position": {
+            "x": x_position,
+            "y": y_position
+        },
+        "geometry": {
+            "height": CARD_HEIGHT,
+            "width": CARD_WIDTH
+        }
     }
-    return color_map.get(color_name.lower(), color_name)
 
-def sync_tasks_to_miro():
-    """Sync tasks to Miro."""
-    api = miro_api.MiroApi(miro_access_token)
-    
-    with sqlite3.connect(DB_FILE) as conn:
+def create_miro_card(api, session, task_id, payload, assignee_tag_id):
+    """Create a Miro card for a task and return its Miro ID."""
+    response = session.post(f'https://api.miro.com/v2/boards/{miro_board_id}/cards', json=payload)
+    if response.status_code == 201:
+        response_data = response.json()
+        response_id = response_data.get('id')  # Extract the 'id' from the response
+        print(f"Card created for task {task_id} with ID {response_id}.")
+        if assignee_tag_id:
+            api.attach_tag_to_item(miro_board_id, response_id, assignee_tag_id)
+        return response_id
+    else:
+        print(f"Failed to create card for task {task_id} with code {response.status_code} Response: {response.json()}")
+        return None
+
+def refresh_miro_card(api, session, task, assignee_tag_id):
+    """Push a changed task to its existing Miro card and report whether it succeeded."""
+    task_id, content, description, assignee_hex_color, due_date, miro_id, assignee_id = task
+    print(f"Updating task {task_id} with miro_id {miro_id}.")
+    if not update_miro_card(session, miro_id, content, description, due_date, assignee_hex_color):
+        return False
+    if assignee_tag_id:
+        api.attach_tag_to_item(miro_board_id, miro_id, assignee_tag_id)
+    return True
+
+def sync_new_tasks_to_miro(conn):
+    """Create Miro cards for tasks that have not been synced yet (sync_status = 0)."""
+    api = miro_client(miro_access_token)
+    # Resolved here, not in the workers, so every thread shares the one pooled session
+    session = miro_session(miro_access_token)
+
+    with conn:
         cursor = conn.cursor()
-        
-        # Fetch tasks to sync with sync_status = 0
-        cursor.execute('SELECT id, content, description, assignee_hex_color, due_date, assignee_id FROM tasks WHERE sync_status = 0')
+        cursor.execute(SELECT_TASKS_TO_CREATE_SQL)
         tasks_to_create = cursor.fetchall()
-
-        max_per_column = 17
-        card_width = 300
-        card_height = 100
-        horizontal_spacing = 10  # Abstand zwischen Spalten
-        vertical_spacing = 1  # Abstand zwischen Zeilen
+        if not tasks_to_create:
+            return
 
         # Fetch the coordinates of the frame "Eingang"
-        x_offset, y_offset = fetch_frame_coordinates(miro_board_id, "Eingang")
-        
-        x_offset = x_offset + card_width /2 + 10
-        y_offset = y_offset + card_height /2 + 5
-
-        for idx, task in enumerate(tasks_to_create):
-            column_index = idx // max_per_column
-            row_index = idx % max_per_column
-            x_position = column_index * (card_width + horizontal_spacing) + x_offset
-            y_position = row_index * (card_height + vertical_spacing) + y_offset
-
-            due_date_str = task[4]
-            if due_date_str:
-                due_date = datetime.strptime(due_date_str, "%Y-%m-%d")
-                due_date_formatted = due_date.isoformat() + 'Z'
-            else:
-                due_date_formatted = None
-
-            card_theme_hex = color_name_to_hex(task[3])
-
-            payload = {
-                "data": {
-                    "description": task[2],
-                    "title": task[1],
-                    "dueDate": due_date_formatted
-                },
-                "style": {
-                    "cardTheme": card_theme_hex
-                },
-                "position": {
-                    "x": x_position,
-                    "y": y_position
-                },
-                "geometry": {
-                    "height": card_height,
-                    "width": card_width
-                }
+        x_offset, y_offset = fetch_frame_coordinates(conn, miro_board_id, "Eingang")
+
+        x_offset = x_offset + CARD_WIDTH /2 + 10
+        y_offset = y_offset + CARD_HEIGHT /2 + 5
+
+        # Load all collaborator tags once instead of querying per card
+        tag_ids = fetch_collaborator_tag_ids(cursor)
+
+        # Collect sync results and write them back in one transaction at the end
+        created_cards = []
+
+        # Create the cards concurrently; the database is only touched from this thread
+        with ThreadPoolExecutor(max_workers=MIRO_MAX_WORKERS) as executor:
+            futures = {
+                executor.submit(
+                    create_miro_card, api, session, task[0],
+                    build_card_payload(idx, task, x_offset, y_offset),
+                    tag_ids.get(task[5])
+                ): task[0]
+                for idx, task in enumerate(tasks_to_create)
             }
+            for future in as_completed(futures):
+                try:
+                    response_id = future.result()
+                except Exception as error:
+                    print(f"Error creating card for task {futures[future]}: {error}")
+                    continue
+                if response_id:
+                    created_cards.append((response_id, futures[future]))
+
+        conn.execute('BEGIN')
+        cursor.executemany(MARK_CARD_CREATED_SQL, created_cards)
+        conn.commit()
 
-            headers = {
-                'accept': 'application/json',
-                'authorization': f'Bearer {miro_access_token}',
-                'content-type': 'application/json',
-            }
-
-            response = requests.post(f'https://api.miro.com/v2/boards/{miro_board_id}/cards', headers=headers, json=payload)
-            if response.status_code == 201:
-                response_data = response.json()
-                response_id = response_data.get('id')  # Extract the 'id' from the response
-
-                cursor.execute('UPDATE tasks SET sync_status = 1, miro_id = ? WHERE id = ?', (response_id, task[0]))
-                print(f"Card created for task {task[0]} with ID {response_id}.")
-                assignee_tag_id = fetch_assignee_tag_id(cursor, task[5])
-                if assignee_tag_id:
-                    api.attach_tag_to_item(miro_board_id, response_id, assignee_tag_id)
-            else:
-                print(f"Failed to create card for task {task[0]} with code {response.status_code} Response: {response.json()}")
+def sync_updated_tasks_to_miro(conn):
+    """Push changed tasks (sync_status = 2) to their existing Miro cards."""
+    api = miro_client(miro_access_token)
+    # Resolved here, not in the workers, so every thread shares the one pooled session
+    session = miro_session(miro_access_token)
 
-        # Fetch tasks to sync with sync_status = 2 (updates)
-        cursor.execute('SELECT id, content, description, assignee_hex_color, due_date, miro_id, assignee_id FROM tasks WHERE sync_status = 2')
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute(SELECT_TASKS_TO_UPDATE_SQL)
         tasks_to_update = cursor.fetchall()
+        if not tasks_to_update:
+            return
 
-        for task in tasks_to_update:
-            task_id, content, description, assignee_hex_color, due_date, miro_id, assignee_id = task
-            print(f"Updating task {task_id} with miro_id {miro_id}.")
-            if update_miro_card(miro_id, content, description, due_date, assignee_hex_color):
-                cursor.execute('UPDATE tasks SET sync_status = 1 WHERE id = ?', (task_id,))
-                assignee_tag_id = fetch_assignee_tag_id(cursor, assignee_id)
-                if assignee_tag_id:
-                    api.attach_tag_to_item(miro_board_id, miro_id, assignee_tag_id)
-        
-        conn.commit()
+        # Load all collaborator tags once instead of querying per card
+        tag_ids = fetch_collaborator_tag_ids(cursor)
 
+        # Collect sync results and write them back in one transaction at the end
+        updated_task_ids = []
 
+        # Push the updates concurrently; the database is only touched from this thread
+        with ThreadPoolExecutor(max_workers=MIRO_MAX_WORKERS) as executor:
+            futures = {
+                executor.submit(refresh_miro_card, api, session, task, tag_ids.get(task[6])): task[0]
+                for task in tasks_to_update
+            }
+            for future in as_completed(futures):
+                try:
+                    updated = future.result()
+                except Exception as error:
+                    print(f"Error updating card for task {futures[future]}: {error}")
+                    continue
+                if updated:
+                    updated_task_ids.append((futures[future],))
+
+        conn.execute('BEGIN')
+        cursor.executemany(MARK_CARD_UPDATED_SQL, updated_task_ids)
+        conn.commit()
 
-def fetch_frame_coordinates(miro_board_id, frame_title):
-    api = miro_api.MiroApi(miro_access_token)
-    items = api.get_items(miro_board_id)
 
-    # Use the provided logic to find the frame ID by its title
-    rahmen_id = next((item.id for item in items.data if hasattr(item.data.actual_instance, 'title') and item.data.actual_instance.title == frame_title), None)
 
-    if not rahmen_id:
+@lru_cache(maxsize=None)
+def list_frames(api, miro_board_id):
+    """List the board's frames once per run as a title -> ID map."""
+    # Only frames are needed, so let Miro filter out every other item type
+    items = api.get_items(miro_board_id, type='frame')
+    frames = {}
+    for item in items.data:
+        # Keep the first frame for each title, as the lookup by title always did
+        frames.setdefault(getattr(item.data.actual_instance, 'title', None), item.id)
+    return frames
+
+def find_frame_id(conn, api, miro_board_id, frame_title, refresh=False):
+    """Find the ID of the first frame with the given title, remembering it across runs."""
+    key = f'frame_id:{miro_board_id}:{frame_title}'
+    cursor = conn.cursor()
+    if not refresh:
+        cursor.execute('SELECT value FROM meta WHERE key = ?', (key,))
+        result = cursor.fetchone()
+        if result:
+            return result[0]
+
+    if refresh:
+        list_frames.cache_clear()
+    frame_id = list_frames(api, miro_board_id).get(frame_title)
+    if frame_id:
+        cursor.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, frame_id))
+    else:
+        cursor.execute('DELETE FROM meta WHERE key = ?', (key,))
+    return frame_id
+
+def fetch_from_frame(conn, api, miro_board_id, frame_title, fetch):
+    """Call fetch with the ID of the titled frame, or return None if there is no such frame."""
+    frame_id = find_frame_id(conn, api, miro_board_id, frame_title)
+    if not frame_id:
+        return None
+    try:
+        return fetch(frame_id)
+    except Exception:
+        # The remembered frame may have been deleted or replaced since the last run
+        fresh_frame_id = find_frame_id(conn, api, miro_board_id, frame_title, refresh=True)
+        if fresh_frame_id == frame_id:
+            raise
+        return fetch(fresh_frame_id) if fresh_frame_id else None
+
+def fetch_frame_coordinates(conn, miro_board_id, frame_title):
+    api = miro_client(miro_access_token)
+    frame_item = fetch_from_frame(conn, api, miro_board_id, frame_title, lambda frame_id: api.get_specific_item(miro_board_id, frame_id))
+
+    if frame_item is None:
         return None, None
-    
-    frame_item = api.get_specific_item(miro_board_id, rahmen_id)
 
     if hasattr(frame_item, 'position') and hasattr(frame_item, 'geometry'):
         position = frame_item.position
@@ -340,6 +577,7 @@ def fetch_frame_coordinates(miro_board_id, frame_title):
 
 
 
+@lru_cache(maxsize=1024)
 def extract_first_name(full_name):
     """Extract the first name from a full name."""
     separators = [' ', '.']
@@ -348,67 +586,77 @@ def extract_first_name(full_name):
             return full_name.split(sep)[0].capitalize().strip()
     return full_name.capitalize().strip()
 
+@lru_cache(maxsize=1024)
 def generate_hex_color(name):
     """Generate a hex color code from a string."""
-    color_hash = hashlib.md5(name.encode()).hexdigest()
-    return '#' + color_hash[:6]
+    # CRC32 is stable across runs (unlike hash()) and much cheaper than MD5
+    return f'#{zlib.crc32(name.encode()) & 0xFFFFFF:06x}'
+
+def fetch_collaborator_hex_colors(cursor):
+    """Fetch the hex colors of all collaborators keyed by collaborator ID."""
+    cursor.execute('SELECT id, hex_color FROM collaborators')
+    return dict(cursor.fetchall())
 
-def fetch_assignee_hex_color(cursor, assignee_id):
-    """Fetch the hex color of the assignee."""
-    cursor.execute('SELECT hex_color FROM collaborators WHERE id = ?', (assignee_id,))
-    result = cursor.fetchone()
-    return result[0] if result else generate_hex_color("Unknown Assignee")
+def lookup_assignee_hex_color(hex_colors, assignee_id):
+    """Look up the hex color of the assignee in a preloaded color map."""
+    if not assignee_id:
+        return '#ffffff'
+    return hex_colors[assignee_id] if assignee_id in hex_colors else generate_hex_color("Unknown Assignee")
 
 def load_colors_from_csv(file_path):
     """Load collaborator colors from a CSV file."""
     if os.path.exists(file_path):
-        colors_df = pd.read_csv(file_path)
-        return dict(zip(colors_df['id'], colors_df['hex']))
+        with open(file_path, newline='') as colors_file:
+            return {int(row['id']): row['hex'] for row in csv.DictReader(colors_file)}
     return {}
 
-def fetch_done_frame_items():
+def fetch_done_frame_items(conn):
     """Fetch items from the 'done' frame in Miro."""
-    api = miro_api.MiroApi(miro_access_token)
-    items = api.get_items(miro_board_id)
+    api = miro_client(miro_access_token)
+    items = fetch_from_frame(conn, api, miro_board_id, "Done", lambda frame_id: api.get_items_within_frame(miro_board_id, frame_id))
 
-    rahmen_id = next((item.id for item in items.data if hasattr(item.data.actual_instance, 'title') and item.data.actual_instance.title == "Done"), None)
+    return items if items is not None else []
 
-    return api.get_items_within_frame(miro_board_id, rahmen_id) if rahmen_id else []
+def close_todoist_task(api, task_id):
+    """Mark a Todoist task as done and report whether it succeeded."""
+    try:
+        api.close_task(task_id=task_id)
+        print(f"Task {task_id} marked as done in Todoist.")
+        return True
+    except Exception as error:
+        print(f"Error updating task {task_id}: {error}")
+        return False
 
-def complete_todoist_task(task_id):
-    """Update a Todoist task."""
-    api = TodoistAPI(todoist_api_token)
-        # check in db if task is already completed
-    with sqlite3.connect(DB_FILE) as conn:
+def complete_todoist_tasks(conn, miro_ids):
+    """Mark the tasks behind the given Miro cards as done in Todoist."""
+    api = todoist_client(todoist_api_token)
+    with conn:
         cursor = conn.cursor()
-        cursor.execute('SELECT is_completed FROM tasks WHERE id = ?', (task_id,))
-        result = cursor.fetchone()
-        if result[0] == 1:
+        # Resolve all cards in one query; json_each avoids the bound-parameter limit of IN (?, ?, ...)
+        cursor.execute('''
+            SELECT id FROM tasks
+            WHERE is_completed IS NOT 1 AND miro_id IN (SELECT value FROM json_each(?))
+        ''', (json.dumps(miro_ids),))
+        task_ids = [row[0] for row in cursor.fetchall()]
+        if not task_ids:
             return
-        else:
-            try:
-                api.close_task(task_id=task_id)
-                print(f"Task {task_id} marked as done in Todoist.")
-                # change db entry to is_completed = 1
-                cursor.execute('UPDATE tasks SET is_completed = 1 WHERE id = ?', (task_id,))
-                conn.commit()     
-            except Exception as error:
-                print(f"Error updating task {task_id}: {error}")
-
-
-def get_existing_ids(table, column):
-    """Get existing IDs from a specified table."""
-    with sqlite3.connect(DB_FILE) as conn:
-        cursor = conn.cursor()
-        cursor.execute(f'SELECT {column} FROM {table}')
-        return set(row[0] for row in cursor.fetchall())
+
+        with ThreadPoolExecutor(max_workers=TODOIST_MAX_WORKERS) as executor:
+            results = executor.map(lambda task_id: close_todoist_task(api, task_id), task_ids)
+            completed_task_ids = [(task_id,) for task_id, closed in zip(task_ids, results) if closed]
+
+        conn.execute('BEGIN')
+        cursor.executemany('UPDATE tasks SET is_completed = 1 WHERE id = ?', completed_task_ids)
+        conn.commit()
 
 
-def update_tasks_in_db(tasks):
+def update_tasks_in_db(conn, tasks):
     """Update tasks in the SQLite database."""
     try:
-        with sqlite3.connect(DB_FILE) as conn:
+        with conn:
             cursor = conn.cursor()
+            hex_colors = fetch_collaborator_hex_colors(cursor)
+            rows = []
             for task in tasks:
                 # Prepare the values to be updated, with defaults if necessary
                 content = task.get('content', '')
@@ -424,7 +672,7 @@ def update_tasks_in_db(tasks):
                 comment_count = task.get('comment_count', 0)
                 is_completed = int(task.get('is_completed', 0))
                 description = task.get('description', '')
-                labels = json.dumps(task.get('labels', []))
+                labels = encode_labels(task.get('labels', []))
                 order = task.get('order', 0)
                 priority = task.get('priority', 1)
                 section_id = task.get('section_id', None)
@@ -435,85 +683,38 @@ def update_tasks_in_db(tasks):
                 owner = 'owner'  # Static value as per original code
                 task_id = task.get('id')
 
-                assignee_hex_color = fetch_assignee_hex_color(cursor, assignee_id) if assignee_id else '#ffffff'
+                assignee_hex_color = lookup_assignee_hex_color(hex_colors, assignee_id)
                 sync_status = 2
 
                 if not task_id:
                     raise ValueError(f"Task ID is missing for task: {task}")
 
-                cursor.execute('''
-                    UPDATE tasks SET
-                        content = ?, project_id = ?, due_date = ?, due_datetime = ?, due_string = ?, due_timezone = ?,
-                        creator_id = ?, created_at = ?, assignee_id = ?, assigner_id = ?, comment_count = ?, is_completed = ?,
-                        description = ?, labels = ?, "order" = ?, priority = ?, section_id = ?, parent_id = ?, url = ?,
-                        duration_amount = ?, duration_unit = ?, owner = ?, assignee_hex_color = ?, sync_status = ?
-                    WHERE id = ?
-                ''', (
+                rows.append((
                     content, project_id, due_date, due_datetime, due_string, due_timezone,
                     creator_id, created_at, assignee_id, assigner_id, comment_count, is_completed,
                     description, labels, order, priority, section_id, parent_id, url,
                     duration_amount, duration_unit, owner, assignee_hex_color, sync_status, task_id
                 ))
+
+            conn.execute('BEGIN')
+            cursor.executemany(UPDATE_TASK_SQL, rows)
             conn.commit()
     except sqlite3.Error as e:
         print(f"SQLite error: {e}")
     except Exception as e:
         print(f"Unexpected error: {e}")
 
-def fetch_todoist_tasks(api_token, project_id):
-    """Fetch tasks from a specific Todoist project."""
-    api = TodoistAPI(api_token)
-    try:
-        return api.get_tasks(project_id=project_id)
-    except Exception as error:
-        print(f"Error fetching tasks: {error}")
-        return []
-
-def fetch_tasks_from_db():
-    """Fetch tasks from the SQLite database."""
-    with sqlite3.connect(DB_FILE) as conn:
+def fetch_task_digests(conn):
+    """Fetch the fields compared against Todoist for every task, keyed by task ID."""
+    with conn:
         cursor = conn.cursor()
-        cursor.execute('SELECT id, content, project_id, due_date, due_datetime, due_string, due_timezone, creator_id, created_at, assignee_id, assigner_id, comment_count, is_completed, description, labels, "order", priority, section_id, parent_id, url, duration_amount, duration_unit, owner, sync_status, miro_id, assignee_firstname, assignee_hex_color FROM tasks')
-        tasks = cursor.fetchall()
-        # Map the results to a list of dictionaries for easy lookup
-        task_list = []
-        for row in tasks:
-            task_list.append({
-                'id': row[0],
-                'content': row[1],
-                'project_id': row[2],
-                'due_date': row[3],
-                'due_datetime': row[4],
-                'due_string': row[5],
-                'due_timezone': row[6],
-                'creator_id': row[7],
-                'created_at': row[8],
-                'assignee_id': row[9],
-                'assigner_id': row[10],
-                'comment_count': row[11],
-                'is_completed': row[12],
-                'description': row[13],
-                'labels': row[14],
-                'order': row[15],
-                'priority': row[16],
-                'section_id': row[17],
-                'parent_id': row[18],
-                'url': row[19],
-                'duration_amount': row[20],
-                'duration_unit': row[21],
-                'owner': row[22],
-                'sync_status': row[23],
-                'miro_id': row[24],
-                'assignee_firstname': row[25],
-                'assignee_hex_color': row[26]
-            })
-        return task_list
-    
+        cursor.execute('SELECT id, content, due_date, is_completed, description, assignee_id FROM tasks')
+        return {row[0]: row[1:] for row in cursor.fetchall()}
 
-def update_miro_card(miro_id, title, description, due_date, card_theme):
+def update_miro_card(session, miro_id, title, description, due_date, card_theme):
     """Update a Miro card."""
     print(f"Updating Miro card {miro_id} with title {title}, description {description}, due date {due_date}, and card theme {card_theme}.")
-    due_date_formatted = datetime.strptime(due_date, "%Y-%m-%d").isoformat() + 'Z' if due_date else None
+    due_date_formatted = format_due_date(due_date)
     
     payload = {"data": {}, "style": {}}
     
@@ -531,13 +732,7 @@ def update_miro_card(miro_id, title, description, due_date, card_theme):
         return True  # No changes needed
 
 
-    headers = {
-        'accept': 'application/json',
-        'authorization': f'Bearer {miro_access_token}',
-        'content-type': 'application/json',
-    }
-    
-    response = requests.patch(f'https://api.miro.com/v2/boards/{miro_board_id}/cards/{miro_id}', headers=headers, json=payload)
+    response = session.patch(f'https://api.miro.com/v2/boards/{miro_board_id}/cards/{miro_id}', json=payload)
     
     catch = response.json()
     if 'message' in catch:
@@ -546,34 +741,29 @@ def update_miro_card(miro_id, title, description, due_date, card_theme):
     
     return response.status_code == 200
 
-def compare_and_update_tasks():
+def compare_and_update_tasks(conn):
     """Compare and update tasks from Todoist to the database."""
+    # Fetched again on purpose: tasks closed from the Done frame earlier in this run must not come back
     todoist_tasks = fetch_todoist_tasks(todoist_api_token, todoist_projectid)
-    db_tasks = fetch_tasks_from_db()
-    
-    print(f"Fetched {len(todoist_tasks)} tasks from Todoist and {len(db_tasks)} tasks from the database.")
+    # Only the compared fields are loaded, keyed by task ID for quick lookup
+    db_tasks = fetch_task_digests(conn)
 
-    # Map db tasks by id for quick lookup
-    db_tasks_dict = {task['id']: task for task in db_tasks}
+    print(f"Fetched {len(todoist_tasks)} tasks from Todoist and {len(db_tasks)} tasks from the database.")
 
     tasks_to_update = []
-    
 
     for todoist_task in todoist_tasks:
-        db_task = db_tasks_dict.get(todoist_task.id)
+        db_task = db_tasks.get(todoist_task.id)
         if db_task:
             # Compare fields and update if necessary
             todoist_due_date = todoist_task.due.date if todoist_task.due else None
             todoist_completed = int(todoist_task.is_completed)
-            if (db_task['content'] != todoist_task.content or
-                db_task['due_date'] != todoist_due_date or
-                db_task['is_completed'] != todoist_completed or
-                db_task['description'] != todoist_task.description or
-                db_task['assignee_id'] != todoist_task.assignee_id):
-                
+            if db_task != (todoist_task.content, todoist_due_date, todoist_completed,
+                           todoist_task.description, todoist_task.assignee_id):
+
                 # Check if the assignee has been changed
-                assignee_changed = db_task['assignee_id'] != todoist_task.assignee_id
-                
+                assignee_changed = db_task[4] != todoist_task.assignee_id
+
                 tasks_to_update.append({
                     'id': todoist_task.id,
                     'content': todoist_task.content,
@@ -586,7 +776,7 @@ def compare_and_update_tasks():
 
     if tasks_to_update:
         print(f"Updating {len(tasks_to_update)} tasks in the database.")
-        update_tasks_in_db(tasks_to_update)
+        update_tasks_in_db(conn, tasks_to_update)
     else:
         print("No tasks to update.")
 
@@ -595,7 +785,7 @@ def compare_and_update_tasks():
 
 def fetch_miro_tags():
     """Fetch tags from Miro board using MiroApi."""
-    api = miro_api.MiroApi(miro_access_token)
+    api = miro_client(miro_access_token)
     tags_response = api.get_tags_from_board(miro_board_id)
     if tags_response and hasattr(tags_response, 'data'):
         return tags_response.data
@@ -606,51 +796,43 @@ def fetch_miro_tags():
 
 
 
-def update_collaborator_hex_colors_and_tags(tags):
+def update_collaborator_hex_colors_and_tags(conn, tags):
     """Update collaborator hex colors and tag IDs in the database based on Miro tags."""
-    with sqlite3.connect(DB_FILE) as conn:
+    with conn:
         cursor = conn.cursor()
+        # Load every collaborator once, keyed the way "= ? COLLATE NOCASE" compares names
+        cursor.execute('SELECT first_name, hex_color, tag_id FROM collaborators')
+        collaborators = {}
+        for first_name, hex_color, tag_id in cursor.fetchall():
+            if first_name is not None:
+                collaborators.setdefault(first_name.translate(NOCASE_FOLD), (hex_color, tag_id))
+
+        changed_tags = []
         for tag in tags:
             tag_name = tag.title
             tag_color = tag.fill_color
             tag_id = tag.id
-            cursor.execute('''
-                SELECT hex_color, tag_id
-                FROM collaborators
-                WHERE first_name LIKE ?
-            ''', (tag_name,))
-            result = cursor.fetchone()
+            result = collaborators.get(tag_name.translate(NOCASE_FOLD))
             if result:
                 current_color, current_tag_id = result
                 if current_color != tag_color or current_tag_id != tag_id:
-                    cursor.execute('''
-                        UPDATE collaborators
-                        SET hex_color = ?, tag_id = ?
-                        WHERE first_name LIKE ?
-                    ''', (tag_color, tag_id, tag_name))
+                    changed_tags.append((tag_color, tag_id, tag_name))
                     print (f"Updating hex color and tag ID for collaborator {tag_name} to {tag_color} and {tag_id} from {current_color} and {current_tag_id}.")
-                elif current_color != tag_color:
-                    cursor.execute('''
-                        UPDATE collaborators
-                        SET hex_color = ?
-                        WHERE first_name LIKE ?
-                    ''', (tag_color, tag_name))
-                    print(f"Updated hex color for collaborator {tag_name} to {tag_color}.")
-                elif current_tag_id != tag_id:
-                    cursor.execute('''
-                        UPDATE collaborators
-                        SET tag_id = ?
-                        WHERE first_name LIKE ?
-                    ''', (tag_id, tag_name))
-                    print(f"Updated tag ID for collaborator {tag_name} to {tag_id}.")
             else:
                 print(f"No collaborator found with the name {tag_name}.")
+
+        conn.execute('BEGIN')
+        cursor.executemany('''
+            UPDATE collaborators
+            SET hex_color = ?, tag_id = ?
+            WHERE first_name = ? COLLATE NOCASE
+        ''', changed_tags)
         conn.commit()
 
 
-def create_tags_for_users_without_tags():
+def create_tags_for_users_without_tags(conn):
     """Create tags for users without tags in Miro."""
-    api = miro_api.MiroApi(miro_access_token)
+    api = miro_client(miro_access_token)
     existing_tags = fetch_miro_tags()
     existing_tag_titles = [tag.title for tag in existing_tags]
 
@@ -659,11 +841,13 @@ def create_tags_for_users_without_tags():
     used_colors = [tag.fill_color for tag in existing_tags]
     available_colors = [color for color in colors if color not in used_colors]
 
-    with sqlite3.connect(DB_FILE) as conn:
+    with conn:
         cursor = conn.cursor()
         cursor.execute('SELECT first_name FROM collaborators WHERE hex_color IS NULL OR hex_color = ""')
         collaborators_without_tags = cursor.fetchall()
 
+        # Collect the new tags and write them back in one transaction at the end
+        created_tags = []
         for collaborator in collaborators_without_tags:
             name = collaborator[0]
             if name not in existing_tag_titles:
@@ -678,63 +862,65 @@ def create_tags_for_users_without_tags():
                 new_tag = api.create_tag(miro_board_id, payload)
                 if new_tag:
                     tag_id = new_tag.id
-                    cursor.execute('''
-                        UPDATE collaborators
-                        SET hex_color = ?, tag_id = ?
-                        WHERE first_name = ?
-                    ''', (color, tag_id, name))
-                    conn.commit()
+                    created_tags.append((color, tag_id, name))
                     print(f"Tag created for {name} with color {color} and tag_id {tag_id}")
 
+        conn.execute('BEGIN')
+        cursor.executemany('''
+            UPDATE collaborators
+            SET hex_color = ?, tag_id = ?
+            WHERE first_name = ?
+        ''', created_tags)
+        conn.commit()
+
 
 
 def main():
     """Main function."""
-    if not os.path.exists(DB_FILE):
-        init_db()
+    conn = connect_db()
+    # Every statement in init_db is idempotent, so existing databases pick up new indexes
+    init_db(conn)
+
+    # Download the tasks in the background while collaborators and tags are processed
+    executor = ThreadPoolExecutor(max_workers=1)
+    tasks_future = executor.submit(fetch_todoist_tasks, todoist_api_token, todoist_projectid)
+    executor.shutdown(wait=False)
 
     collaborators = fetch_todoist_collaborators(todoist_api_token, todoist_projectid)
     if collaborators:
-        new_collaborators_count = insert_collaborators_into_db(collaborators, {})
+        new_collaborators_count = insert_collaborators_into_db(conn, collaborators, {})
         print(f"{new_collaborators_count} new collaborators inserted into the database.")
 
 
     # Fetch tags from Miro and update collaborator colors
     miro_tags = fetch_miro_tags()
     if miro_tags:
-        update_collaborator_hex_colors_and_tags(miro_tags)
+        update_collaborator_hex_colors_and_tags(conn, miro_tags)
 
     # Create tags for users without tags
-    create_tags_for_users_without_tags()
+    create_tags_for_users_without_tags(conn)
 
-    add_column_if_not_exists('tasks', 'assignee_firstname', 'TEXT')
-    add_column_if_not_exists('tasks', 'assignee_hex_color', 'TEXT') 
-    update_assignee_firstname()
+    update_assignee_firstname(conn)
 
 
-    tasks = fetch_todoist_tasks(todoist_api_token, todoist_projectid)
+    tasks = tasks_future.result()
     if tasks:
-        new_tasks_count = insert_tasks_into_db(tasks)
+        new_tasks_count = insert_tasks_into_db(conn, tasks)
         print(f"{new_tasks_count} new tasks inserted into the database.")
-        sync_tasks_to_miro()
     else:
         print("No tasks found or error fetching data.")
+    # Also picks up cards left at sync_status = 0 by an earlier failed run; returns early if none are pending
+    sync_new_tasks_to_miro(conn)
 
-    done_frame_items = fetch_done_frame_items()
+    done_frame_items = fetch_done_frame_items(conn)
     if done_frame_items:
-        with sqlite3.connect(DB_FILE) as conn:
-            cursor = conn.cursor()
-            for item in done_frame_items.data:
-                miro_id = item.id
-                cursor.execute('SELECT id FROM tasks WHERE miro_id = ?', (miro_id,))
-                result = cursor.fetchone()
-                if result:
-                    complete_todoist_task(result[0])
+        complete_todoist_tasks(conn, [item.id for item in done_frame_items.data])
     else:
         print("No done frame items found or error fetching data.")
     
-    compare_and_update_tasks()
-    sync_tasks_to_miro()
+    compare_and_update_tasks(conn)
+    sync_updated_tasks_to_miro(conn)
+    conn.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file